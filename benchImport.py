@@ -0,0 +1,51 @@
+"""Measure how long it takes to import the core grocery list modules.
+
+Run with:  python benchImport.py [runs]
+
+Each run imports the module in a fresh interpreter so nothing is cached, and
+also checks that the heavy modules (tkinter, requests, urllib.request) were
+not pulled in as a side effect.
+"""
+import subprocess
+import sys
+import time
+
+MODULES = ["parser_1", "groceryListGenerator"]
+HEAVY = ["tkinter", "requests", "urllib.request", "csv", "hashlib"]
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def timeImport(module: str, runs: int = 20):
+    times = []
+    loaded = set()
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD.format(module=module, heavy=HEAVY)],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(out[0]))
+        if len(out) > 1:
+            loaded.update(out[1].split(","))
+    times.sort()
+    return times[len(times) // 2], sorted(loaded)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for module in MODULES:
+        median, loaded = timeImport(module, runs)
+        print(f"{module}: median {median * 1000:.2f} ms over {runs} runs")
+        if loaded:
+            print(f"  warning: heavy modules loaded at import: {', '.join(loaded)}")
+
+
+if __name__ == "__main__":
+    main()
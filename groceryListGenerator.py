@@ -1,12 +1,10 @@
 import os
-import csv
-import hashlib
-import urllib.request as req
-import tkinter as tk
-from tkinter import messagebox
 from fractions import Fraction
 import re
 
+# tkinter, csv and hashlib are imported inside the functions that need them so
+# that importing this module for parseQuantity/combineIngredients stays cheap.
+
 URL = ""
 
 innerFrame = None
@@ -19,12 +17,13 @@ buttons = []
 
 # Parsing lives in a separate module to make it easy to test without importing tkinter
 
-from parser_1 import Ingredient, getHtml, getInfo
+from parser_1 import Ingredient, canonicalizeUrl, getIngredients, ScanBudgetExceeded
 
 # Simple in-memory user store: username -> password_hash
 USER_STORE = {}
 
 def hashPassword(password: str) -> str:
+    import hashlib
     return hashlib.sha256(password.encode("utf-8")).hexdigest()
 
 def normalizeName(name: str) -> str:
@@ -89,7 +88,20 @@ unitConversions = {
     ("pound", "oz"): 16,
     ("oz", "pound"): 1/16,
 }
-unitCanonical = {alias: canon for canon, aliases in unitMap.items() for alias in aliases}
+# alias -> canonical unit, built on first use (see _getUnitCanonical)
+_unitCanonical = None
+
+def _getUnitCanonical() -> dict:
+    global _unitCanonical
+    if _unitCanonical is None:
+        _unitCanonical = {alias: canon for canon, aliases in unitMap.items() for alias in aliases}
+    return _unitCanonical
+
+def __getattr__(name):
+    # keep `groceryListGenerator.unitCanonical` working now that it is lazy
+    if name == "unitCanonical":
+        return _getUnitCanonical()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def normalizeUnit(unit: str) -> str:
     if not unit:
@@ -99,7 +111,7 @@ def normalizeUnit(unit: str) -> str:
     u = u.replace('fluid ounce', 'fl oz')  # handle 'fluid ounce' as 'fl oz'
     u = u.replace('fl oz', 'fl oz')
     u = u.strip()
-    return unitCanonical.get(u, u)
+    return _getUnitCanonical().get(u, u)
 
 
 def parseQuantity(q: str) -> Fraction | None:
@@ -206,17 +218,36 @@ ingredientCountToWeight = {
     "fettuccine": 2,  # 1 cup dry ≈ 2 oz (approximate)
 }
 
-def combineIngredients(items: list) -> list:
-    """Combine ingredients with improved fuzzy name and canonical unit logic."""
-    agg = {}
-    nonNumeric = []
-    for it in items:
+class PartialAggregate:
+    """Mergeable partial result of combineIngredients.
+
+    Holds the (canonical name, canonical unit) -> quantity map for one shard
+    of the input. Shards can be built independently (e.g. in worker
+    processes) and merged; merging shards in input order gives exactly the
+    same result as combining the whole list at once.
+    """
+
+    def __init__(self):
+        self.agg = {}
+        # items whose quantity can't be parsed are left out of the list, as before;
+        # only count them so shards stay small to pickle
+        self.nonNumericCount = 0
+
+    def _accumulate(self, key, qty, unit, displayName):
+        if key not in self.agg:
+            self.agg[key] = {'qty': Fraction(0), 'unit': unit, 'displayName': displayName}
+        self.agg[key]['qty'] += qty
+        # longest name wins; on a tie the first one seen is kept
+        if len(displayName) > len(self.agg[key]['displayName']):
+            self.agg[key]['displayName'] = displayName
+
+    def add(self, it):
         nameKey = canonicalizeName(it.name)
         unitKey = normalizeUnit(it.unit)
         qty = parseQuantity(it.quantity)
         if qty is None:
-            nonNumeric.append((nameKey, unitKey, it))
-            continue
+            self.nonNumericCount += 1
+            return
         canonUnit = getCanonicalUnit(nameKey)
         if canonUnit is None:
             canonUnit = unitKey  # fallback: use as-is
@@ -229,31 +260,73 @@ def combineIngredients(items: list) -> list:
             qtyInCanon = qty
         if qtyInCanon is None:
             # can't convert, treat as separate
-            key = (nameKey, unitKey)
-            if key not in agg:
-                agg[key] = {'qty': Fraction(0), 'unit': it.unit, 'displayName': it.name}
-            agg[key]['qty'] += qty
-            if len(it.name) > len(agg[key]['displayName']):
-                agg[key]['displayName'] = it.name
-            continue
-        key = (nameKey, canonUnit)
-        if key not in agg:
-            agg[key] = {'qty': Fraction(0), 'unit': canonUnit, 'displayName': it.name}
-        agg[key]['qty'] += qtyInCanon
-        if len(it.name) > len(agg[key]['displayName']):
-            agg[key]['displayName'] = it.name
-    return [
-        Ingredient(
-            name=agg[key]['displayName'],
-            quantity=formatQuantity(agg[key]['qty']),
-            unit=agg[key]['unit']
-        )
-        for key in agg
-    ]
+            self._accumulate((nameKey, unitKey), qty, it.unit, it.name)
+            return
+        self._accumulate((nameKey, canonUnit), qtyInCanon, canonUnit, it.name)
+
+    def addAll(self, items):
+        for it in items:
+            self.add(it)
+        return self
+
+    def mergeInto(self, other: "PartialAggregate") -> "PartialAggregate":
+        """Fold other (which comes after self in input order) into self, in place."""
+        for key, entry in other.agg.items():
+            self._accumulate(key, entry['qty'], entry['unit'], entry['displayName'])
+        self.nonNumericCount += other.nonNumericCount
+        return self
+
+    def merge(self, other: "PartialAggregate") -> "PartialAggregate":
+        """Return a new aggregate of self followed by other (inputs are not modified)."""
+        result = PartialAggregate()
+        for key, entry in self.agg.items():
+            result.agg[key] = dict(entry)
+        result.nonNumericCount = self.nonNumericCount
+        return result.mergeInto(other)
+
+    def toIngredients(self) -> list:
+        return [
+            Ingredient(
+                name=entry['displayName'],
+                quantity=formatQuantity(entry['qty']),
+                unit=entry['unit']
+            )
+            for entry in self.agg.values()
+        ]
+
+
+def combineIngredients(items: list) -> list:
+    """Combine ingredients with improved fuzzy name and canonical unit logic."""
+    return PartialAggregate().addAll(items).toIngredients()
+
+
+def _aggregateShard(items: list) -> PartialAggregate:
+    # module-level so it can be pickled for worker processes
+    return PartialAggregate().addAll(items)
+
+
+def combineIngredientsParallel(items: list, workers: int = None, shardSize: int = 2000) -> list:
+    """Same result as combineIngredients, with the shards aggregated across processes.
+
+    Items are split into contiguous shards of `shardSize`, aggregated in a
+    process pool and merged back in order. Small inputs are combined inline.
+    """
+    if len(items) <= shardSize:
+        return combineIngredients(items)
+    from concurrent.futures import ProcessPoolExecutor
+    shards = [items[i:i + shardSize] for i in range(0, len(items), shardSize)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(_aggregateShard, shards))
+    # the partials are fresh copies from the workers, so fold them in place
+    result = partials[0]
+    for partial in partials[1:]:
+        result.mergeInto(partial)
+    return result.toIngredients()
 def saveUserStore(path: str = None):
     """Persist USER_STORE to CSV file. Overwrites existing file.
     Each row: username, password_hash
     """
+    import csv
     if path is None:
         path = os.path.join(os.getcwd(), "Users.csv")
     try:
@@ -266,6 +339,7 @@ def saveUserStore(path: str = None):
         print(f"Warning: could not save users to {path}: {e}")
 
 def loadUserStore(path: str = None):
+    import csv
     if path is None:
         path = os.path.join(os.getcwd(), "Users.csv")
     if not os.path.exists(path):
@@ -286,6 +360,8 @@ def loadUserStore(path: str = None):
 
 
 def showRegisterDialog(parent) -> None:
+    import tkinter as tk
+    from tkinter import messagebox
     dlg = tk.Toplevel(parent)
     dlg.title("Register")
     dlg.grab_set()
@@ -321,6 +397,8 @@ def showRegisterDialog(parent) -> None:
     parent.wait_window(dlg)
 
 def showLoginDialog(parent) -> bool:
+    import tkinter as tk
+    from tkinter import messagebox
     dlg = tk.Toplevel(parent)
     dlg.title("Login")
     dlg.grab_set()
@@ -353,6 +431,8 @@ def showLoginDialog(parent) -> bool:
     return result["ok"]
 
 def entered(canvas):
+    import tkinter as tk
+    from tkinter import messagebox
     global entryLink, labelList, allThings, allLinks
     url = entryLink.get().strip()
     ingredient = entryIngredient.get().strip()
@@ -368,21 +448,30 @@ def entered(canvas):
         return
 
     try:
-        html = getHtml(url)
+        # Skip links that point at a recipe we already have (tracking params, amp/, http vs https...)
+        canonical = canonicalizeUrl(url)
+        if any(link is not None and canonicalizeUrl(link) == canonical for link in allLinks):
+            messagebox.showinfo("Duplicate link", "That recipe is already in your list.")
+            entryLink.delete(0, "end")
+            return
+
+        # The index is the slot this link will take in allLinks
+        indexOfUrl = len(allLinks)
+        items = getIngredients(url, indexOfUrl)
+    except ScanBudgetExceeded as e:
+        messagebox.showerror("Page Took Too Long", f"Reading the ingredients from that page took too long: {e}")
+        return
     except Exception as e:
         messagebox.showerror("Network Error", f"Could not fetch URL: {e}")
         return
-    
-    # Add link to allLinks here so the index can be added into the class
-    allLinks.append(url)
-    indexOfUrl = len(allLinks) - 1
 
-    # parse
-    items = getInfo(html, indexOfUrl, url)
     if not items:
         messagebox.showinfo("No ingredients", "No ingredients were found on that page.")
         return
 
+    # Only links that produced items get a slot (and a button to remove them)
+    allLinks.append(url)
+
     # append parsed items to allThings and update label
     allThings.extend(items)
 
@@ -398,6 +487,7 @@ def entered(canvas):
     innerFrame.bind("<Configure>", lambda e: canvas.config(scrollregion=canvas.bbox(tk.ALL)))
 
 def enteredIngredient(ingredientName):
+    from tkinter import messagebox
     foundThing = False
     itemsToRemove = []
     for i in range(len(allThings)):
@@ -419,6 +509,7 @@ def enteredIngredient(ingredientName):
 
 
 def linkButtonClicked(buttonUrl, linkIndex, canvas):
+    import tkinter as tk
     global allLinks
     # Remove the items associated with the URL, then remove the URL
     itemsToRemove = []
@@ -459,6 +550,7 @@ def removeButton(removeUrl, removeIndex):
             break
 
 def makeButton(urlIndex, canvas):
+    import tkinter as tk
     global buttons
     buttonText = allLinks[urlIndex]
     buttons.append(tk.Button(innerFrame, text=f"{buttonText}, ({urlIndex})", command=lambda t = buttonText, i=urlIndex: linkButtonClicked(t, i, canvas)))
@@ -474,6 +566,7 @@ def alphabetizeList(list):
 
 
 def main():
+    import tkinter as tk
     # load persisted users (if any)
     loadUserStore()
 
@@ -505,6 +598,7 @@ def main():
     root.mainloop()
 
 def buildMainUi(root):
+    import tkinter as tk
     global entryLink, labelList, innerFrame, entryIngredient
 
     mainFrame = tk.Frame(root, borderwidth=0, highlightthickness=0)
@@ -1,8 +1,18 @@
-import urllib.request as req
-try:
-    import requests
-except ImportError:
-    requests = None
+# requests and urllib.request are imported lazily in getHtml: both pull in
+# http/ssl/email and dominate the import time of this module.
+_requests = None
+
+
+def _getRequests():
+    """Return the requests module, or False if it is not installed."""
+    global _requests
+    if _requests is None:
+        try:
+            import requests
+            _requests = requests
+        except ImportError:
+            _requests = False
+    return _requests
 
 class Ingredient:
     def __init__(self, quantity, unit, name, index=-1, url=""):
@@ -14,207 +24,528 @@ class Ingredient:
         
 
 
-def getHtml(url: str) -> str:
+# Limits for a single page. Fetches stop reading (and decompressing) after
+# MAX_PAGE_BYTES; parsing raises ScanBudgetExceeded after PAGE_TIME_BUDGET seconds.
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+PAGE_TIME_BUDGET = 1.0
+
+_brotli = None
+
+
+def _getBrotli():
+    """Return the brotli module, or False if it is not installed."""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli
+
+
+def _acceptEncoding(allowBrotli: bool = True) -> str:
+    # only advertise br when we (and requests/urllib3) can actually decode it
+    return "gzip, deflate, br" if allowBrotli and _getBrotli() else "gzip, deflate"
+
+
+def _decompress(data: bytes, contentEncoding: str, maxLength: int = None) -> bytes:
+    """Undo a Content-Encoding header for the urllib path.
+
+    Never produces more than maxLength (default MAX_PAGE_BYTES) bytes, so a
+    small compressed bomb cannot blow up into gigabytes. Truncated input
+    decodes to whatever prefix is available.
+    """
+    import zlib
+    if maxLength is None:
+        maxLength = MAX_PAGE_BYTES
+    enc = (contentEncoding or "").strip().lower()
+    if enc in ("", "identity"):
+        return data[:maxLength]
+    if enc in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data, maxLength)
+    if enc == "deflate":
+        try:
+            return zlib.decompressobj().decompress(data, maxLength)
+        except zlib.error:
+            # some servers send raw deflate without the zlib header
+            return zlib.decompressobj(-zlib.MAX_WBITS).decompress(data, maxLength)
+    raise ValueError(f"Unsupported Content-Encoding: {contentEncoding}")
+
+
+def detectCharset(contentType: str, data) -> str:
+    """Pick the text encoding for a page.
+
+    A BOM wins, since it describes the bytes actually sent; otherwise uses
+    the charset from the Content-Type header, then a <meta charset> or
+    http-equiv declaration near the start of the body, and falls back to
+    UTF-8. Always returns a codec name Python knows.
+    """
+    import codecs
+    import re
+    head = bytes(data[:4096])
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        return "utf-32"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    candidates = []
+    if contentType:
+        m = re.search(r'charset=["\']?([\w.:-]+)', contentType, re.IGNORECASE)
+        if m:
+            candidates.append(m.group(1))
+    m = re.search(rb'<meta[^>]+charset=["\']?([\w.:-]+)', head, re.IGNORECASE)
+    if m:
+        candidates.append(m.group(1).decode("ascii"))
+    for name in candidates:
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+def _isAsciiCompatible(encoding: str) -> bool:
+    """True if markup like <li> has the same bytes in `encoding` as in ASCII."""
+    try:
+        # endswith so a BOM-writing codec like utf-8-sig still counts
+        return "<li>".encode(encoding).endswith(b"<li>")
+    except (LookupError, UnicodeError):
+        return False
+
+
+def getHtmlBytes(url: str) -> tuple:
+    """Fetch a page and return (body bytes, encoding) without decoding it.
+
+    The body is already decompressed and holds at most MAX_PAGE_BYTES; use
+    getInfoBytes to extract ingredients straight from it.
+    """
+    requests = _getRequests()
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept-Language": "en-US,en;q=0.9",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        # br only via requests: the urllib path can't bound brotli output
+        "Accept-Encoding": _acceptEncoding(allowBrotli=bool(requests)),
         "Referer": url,
         "Connection": "keep-alive",
         "DNT": "1",
     }
     if requests:
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        return resp.text
+        with requests.get(url, headers=headers, timeout=10, stream=True) as resp:
+            resp.raise_for_status()
+            # iter_content undoes gzip/deflate/br chunk by chunk; stop at the cap
+            chunks = []
+            size = 0
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= MAX_PAGE_BYTES:
+                    break
+            data = b"".join(chunks)[:MAX_PAGE_BYTES]
+            return data, detectCharset(resp.headers.get("Content-Type", ""), data)
     else:
+        import urllib.request as req
         request = req.Request(url, headers=headers)
         with req.urlopen(request) as response:
-            data = response.read()
-            return data.decode("utf-8")
+            data = _decompress(response.read(MAX_PAGE_BYTES + 1), response.headers.get("Content-Encoding", ""))
+            return data, detectCharset(response.headers.get("Content-Type", ""), data)
 
 
-def getInfo(html: str, index = None, url: str = None):
-        def parsePioneerWoman(html):
-            # thepioneerwoman.com: ingredients in <li class="ingredient-item">
-            import re
-            items = []
-            pattern = re.compile(r'<li[^>]*class="[^"]*ingredient-item[^"]*"[^>]*>(.*?)</li>', re.DOTALL)
-            for match in pattern.finditer(html):
-                li = match.group(1)
-                text = re.sub(r'<[^>]+>', '', li).strip()
-                # Try to split: e.g. "1 cup broccoli florets"
-                parts = text.split()
-                if len(parts) >= 3:
-                    quantity, unit = parts[0], parts[1]
-                    name = ' '.join(parts[2:])
-                elif len(parts) == 2:
-                    quantity, unit = parts[0], ''
-                    name = parts[1]
-                elif len(parts) == 1:
-                    quantity, unit, name = '', '', parts[0]
-                else:
-                    continue
-                items.append(Ingredient(quantity, unit, name, index, url))
-            return items
+def getHtml(url: str) -> str:
+    data, encoding = getHtmlBytes(url)
+    return data.decode(encoding, errors="replace")
 
-        def parseTasteOfHome(html):
-            # tasteofhome.com: ingredients in <li class="recipe-ingredients__item">
-            import re
-            items = []
-            pattern = re.compile(r'<li[^>]*class="[^"]*recipe-ingredients__item[^"]*"[^>]*>(.*?)</li>', re.DOTALL)
-            for match in pattern.finditer(html):
-                li = match.group(1)
-                text = re.sub(r'<[^>]+>', '', li).strip()
-                # Try to split: e.g. "1 can cream of chicken soup"
-                parts = text.split()
-                if len(parts) >= 3:
-                    quantity, unit = parts[0], parts[1]
-                    name = ' '.join(parts[2:])
-                elif len(parts) == 2:
-                    quantity, unit = parts[0], ''
-                    name = parts[1]
-                elif len(parts) == 1:
-                    quantity, unit, name = '', '', parts[0]
-                else:
-                    continue
-                items.append(Ingredient(quantity, unit, name, index, url))
-            return items
 
-        def parseGenericListItems(html):
-            # Generic fallback: any <li> that looks like an ingredient (contains a number and a word)
-            import re
-            items = []
-            pattern = re.compile(r'<li[^>]*>(.*?)</li>', re.DOTALL)
-            for match in pattern.finditer(html):
-                li = match.group(1)
-                text = re.sub(r'<[^>]+>', '', li).strip()
-                # Heuristic: must start with a number or fraction
-                if re.match(r'^[\d\u00BC-\u00BE\u2150-\u215E]', text):
-                    parts = text.split()
-                    if len(parts) >= 3:
-                        quantity, unit = parts[0], parts[1]
-                        name = ' '.join(parts[2:])
-                    elif len(parts) == 2:
-                        quantity, unit = parts[0], ''
-                        name = parts[1]
-                    elif len(parts) == 1:
-                        quantity, unit, name = '', '', parts[0]
-                    else:
-                        continue
-                    items.append(Ingredient(quantity, unit, name, index, url))
-            return items
-        def parseSite1(html):
-        # Original parser for site with data-ingredient-* attributes
-            items = []
-            currentIndex = 0
-            while True:
-                startQ = html.find('data-ingredient-quantity="true">', currentIndex)
-                if startQ == -1:
-                    break
-                startQ += len('data-ingredient-quantity="true">')
-                endQ = html.find('</span>', startQ)
-                if endQ == -1:
-                    break
-                quantity = html[startQ:endQ].strip()
+class ScanBudgetExceeded(RuntimeError):
+    """Raised when parsing one page takes longer than PAGE_TIME_BUDGET.
 
-                startU = html.find('data-ingredient-unit="true">', endQ)
-                if startU == -1:
-                    break
-                startU += len('data-ingredient-unit="true">')
-                endU = html.find('</span>', startU)
-                if endU == -1:
-                    break
-                unit = html[startU:endU].strip()
+    Deliberately not a TimeoutError: that is an OSError, and callers catching
+    network errors shouldn't mistake a slow parse for one.
+    """
 
-                startN = html.find('data-ingredient-name="true">', endU)
-                if startN == -1:
-                    break
-                startN += len('data-ingredient-name="true">')
-                endN = html.find('</span>', startN)
-                if endN == -1:
-                    break
-                name = html[startN:endN].strip()
 
-                items.append(Ingredient(quantity, unit, name, index, url))
-                currentIndex = endN
-            return items
+class _ScanBudget:
+    """Wall-clock budget shared by every parser run on one page."""
+    def __init__(self, seconds: float = None):
+        import time
+        self.seconds = PAGE_TIME_BUDGET if seconds is None else seconds
+        self._clock = time.perf_counter
+        self.deadline = self._clock() + self.seconds
+        self._ticks = 0
+        self.expired = False
 
-        def parseSite2(html):
-            # Example: Allrecipes.com style (li class="ingredients-item")
-            import re
-            items = []
-            pattern = re.compile(r'<li[^>]*class="[^\"]*ingredients-item[^\"]*"[^>]*>(.*?)</li>', re.DOTALL)
-            for match in pattern.finditer(html):
-                li = match.group(1)
-                # Try to extract quantity, unit, name from text
-                text = re.sub(r'<[^>]+>', '', li).strip()
-                # Naive split: e.g. "1 cup sugar" -> [1, cup, sugar]
-                parts = text.split()
-                if len(parts) >= 3:
-                    quantity, unit = parts[0], parts[1]
-                    name = ' '.join(parts[2:])
-                elif len(parts) == 2:
-                    quantity, unit = parts[0], ''
-                    name = parts[1]
-                elif len(parts) == 1:
-                    quantity, unit, name = '', '', parts[0]
-                else:
-                    continue
-                items.append(Ingredient(quantity, unit, name, index, url))
-            return items
+    def exhausted(self) -> bool:
+        # only read the clock every 64 steps; once expired it stays expired
+        if not self.expired and self._ticks & 0x3F == 0:
+            self.expired = self._clock() > self.deadline
+        self._ticks += 1
+        return self.expired
 
+    def check(self):
+        if self.exhausted():
+            raise ScanBudgetExceeded(f"gave up parsing page after {self.seconds:g} s")
 
-        def parseSite3(html):
-            # tastesbetterfromscratch.com style (li class="wprm-recipe-ingredient")
-            import re
-            items = []
-            pattern = re.compile(r'<li[^>]*class="[^"]*wprm-recipe-ingredient[^"]*"[^>]*>(.*?)</li>', re.DOTALL)
-            for match in pattern.finditer(html):
-                li = match.group(1)
-                # Extract amount, unit, name
-                amount = ''
-                unit = ''
-                name = ''
-                mAmount = re.search(r'<span[^>]*class="[^"]*wprm-recipe-ingredient-amount[^"]*"[^>]*>(.*?)</span>', li)
-                if mAmount:
-                    amount = mAmount.group(1).strip()
-                mUnit = re.search(r'<span[^>]*class="[^"]*wprm-recipe-ingredient-unit[^"]*"[^>]*>(.*?)</span>', li)
-                if mUnit:
-                    unit = mUnit.group(1).strip()
-                mName = re.search(r'<span[^>]*class="[^"]*wprm-recipe-ingredient-name[^"]*"[^>]*>(.*?)</span>', li)
-                if mName:
-                    name = mName.group(1).strip()
-                    # Remove any HTML tags from name
-                    import re as _re
-                    name = _re.sub(r'<[^>]+>', '', name)
-                if name:
-                    items.append(Ingredient(amount, unit, name, index , url))
-            return items
 
-        # Dispatch based on URL or HTML signature
-        if url:
-            if 'allrecipes.' in url:
-                items = parseSite2(html)
-                if items:
-                    return items
-            if 'tastesbetterfromscratch.' in url:
-                items = parseSite3(html)
-                if items:
-                    return items
-            if 'thepioneerwoman.' in url:
-                items = parsePioneerWoman(html)
-                if items:
+def _finder(data):
+    """Return find(sub, pos) for str/bytes, or an equivalent for a memoryview."""
+    if not isinstance(data, memoryview):
+        if isinstance(data, str):
+            return data.find
+        return lambda sub, pos: data.find(sub.encode("latin-1"), pos)
+    import re
+    patterns = {}
+
+    def find(sub, pos):
+        if sub not in patterns:
+            patterns[sub] = re.compile(re.escape(sub.encode("latin-1")))
+        m = patterns[sub].search(data, pos)
+        return m.start() if m else -1
+    return find
+
+
+def _tagClasses(tag: str):
+    """Yield the value of every class="..." attribute in a tag's text."""
+    pos = 0
+    while True:
+        start = tag.find('class="', pos)
+        if start == -1:
+            return
+        start += len('class="')
+        end = tag.find('"', start)
+        if end == -1:
+            return
+        yield tag[start:end]
+        pos = end + 1
+
+
+def _scanElements(data, tagName: str, classFragment: str = "", budget: _ScanBudget = None):
+    """Yield the raw inner content of each <tagName> element (optionally with a class containing classFragment).
+
+    Same matches as finditer over <tagName[^>]*class="[^"]*X[^"]*"[^>]*>(.*?)</tagName>
+    with DOTALL, but linear: the opening tag is found by a compiled search,
+    its end by the next ">", and the close by a plain forward find. Once no
+    ">" or close tag remains the scan stops instead of retrying from every
+    later opening tag. Works on str, bytes and memoryview; yields slices of
+    `data`.
+    """
+    import re
+    find = _finder(data)
+    isText = isinstance(data, str)
+    if isText:
+        opener = re.compile("<" + tagName + r"\b")
+    else:
+        opener = re.compile(b"<" + tagName.encode("ascii") + rb"\b")
+    closeTag = "</" + tagName + ">"
+    pos = 0
+    nextClass = -1
+    while True:
+        if budget is not None:
+            budget.check()
+        if classFragment and nextClass < pos:
+            # no later mention of the class at all: nothing left can match
+            nextClass = find(classFragment, pos)
+            if nextClass == -1:
+                return
+        m = opener.search(data, pos)
+        if not m:
+            return
+        gt = find(">", m.end())
+        if gt == -1:
+            return
+        if classFragment:
+            tag = data[m.end():gt]
+            if not isText:
+                tag = bytes(tag).decode("latin-1")
+            if not any(classFragment in cls for cls in _tagClasses(tag)):
+                pos = gt + 1
+                continue
+        end = find(closeTag, gt + 1)
+        if end == -1:
+            return
+        yield data[gt + 1:end]
+        pos = end + len(closeTag)
+
+
+def _stripTags(text):
+    """Linear-time re.sub(r'<[^>]+>', '', text) for str or bytes."""
+    lt, gt = ("<", ">") if isinstance(text, str) else (b"<", b">")
+    out = []
+    pos = 0
+    while True:
+        i = text.find(lt, pos)
+        if i == -1:
+            break
+        j = text.find(gt, i + 1)
+        if j == -1:
+            break
+        if j == i + 1:
+            # "<>" is not a tag; keep it
+            out.append(text[pos:i + 1])
+            pos = i + 1
+            continue
+        out.append(text[pos:i])
+        pos = j + 1
+    out.append(text[pos:])
+    return text[:0].join(out)
+
+
+def _splitIngredientText(text: str):
+    """Naive "1 cup sugar" -> (quantity, unit, name) split used by the <li> parsers."""
+    parts = text.split()
+    if len(parts) >= 3:
+        return parts[0], parts[1], ' '.join(parts[2:])
+    elif len(parts) == 2:
+        return parts[0], '', parts[1]
+    elif len(parts) == 1:
+        return '', '', parts[0]
+    return None
+
+
+def _parseIngredients(data, index, url, decode):
+    """Shared body of getInfo/getInfoBytes.
+
+    `data` is a str or a memoryview; `decode` turns a tag-stripped fragment
+    of it into text. Only matched fragments are ever decoded. Raises
+    ScanBudgetExceeded if the parsers run past PAGE_TIME_BUDGET.
+    """
+    import re
+    budget = _ScanBudget()
+    isText = isinstance(data, str)
+
+    def toText(fragment) -> str:
+        if not isText:
+            fragment = bytes(fragment)
+        return decode(_stripTags(fragment)).strip()
+
+    def parseListItems(classFragment, requireNumber=False):
+        items = []
+        for li in _scanElements(data, "li", classFragment, budget):
+            text = toText(li)
+            # Heuristic for the generic parser: must start with a number or fraction
+            if requireNumber and not re.match(r'^[\d\u00BC-\u00BE\u2150-\u215E]', text):
+                continue
+            parts = _splitIngredientText(text)
+            if parts is None:
+                continue
+            quantity, unit, name = parts
+            items.append(Ingredient(quantity, unit, name, index, url))
+        return items
+
+    def parsePioneerWoman():
+        # thepioneerwoman.com: ingredients in <li class="ingredient-item">
+        return parseListItems("ingredient-item")
+
+    def parseTasteOfHome():
+        # tasteofhome.com: ingredients in <li class="recipe-ingredients__item">
+        return parseListItems("recipe-ingredients__item")
+
+    def parseGenericListItems():
+        # Generic fallback: any <li> that looks like an ingredient (starts with a number)
+        return parseListItems("", requireNumber=True)
+
+    def parseSite1():
+        # Original parser for site with data-ingredient-* attributes
+        find = _finder(data)
+        items = []
+        pos = 0
+        while True:
+            budget.check()
+            values = []
+            for field in ("quantity", "unit", "name"):
+                marker = f'data-ingredient-{field}="true">'
+                start = find(marker, pos)
+                if start == -1:
                     return items
-            if 'tasteofhome.' in url:
-                items = parseTasteOfHome(html)
-                if items:
+                start += len(marker)
+                end = find("</span>", start)
+                if end == -1:
                     return items
-            # Add more site checks here for other popular recipe sites
+                fragment = data[start:end]
+                values.append(decode(fragment if isText else bytes(fragment)).strip())
+                pos = end
+            items.append(Ingredient(values[0], values[1], values[2], index, url))
+
+    def parseSite2():
+        # Example: Allrecipes.com style (li class="ingredients-item")
+        return parseListItems("ingredients-item")
 
-        # Try all known parsers, return first with results
-        for parser in [parseSite1, parseSite2, parseSite3, parsePioneerWoman, parseTasteOfHome, parseGenericListItems]:
-            items = parser(html)
+    def parseSite3():
+        # tastesbetterfromscratch.com style (li class="wprm-recipe-ingredient")
+        items = []
+        for li in _scanElements(data, "li", "wprm-recipe-ingredient", budget):
+            values = {}
+            for field in ("amount", "unit", "name"):
+                span = next(_scanElements(li, "span", f"wprm-recipe-ingredient-{field}", budget), None)
+                values[field] = toText(span) if span is not None else ''
+            if values["name"]:
+                items.append(Ingredient(values["amount"], values["unit"], values["name"], index, url))
+        return items
+
+    # Dispatch based on URL or HTML signature
+    if url:
+        if 'allrecipes.' in url:
+            items = parseSite2()
+            if items:
+                return items
+        if 'tastesbetterfromscratch.' in url:
+            items = parseSite3()
             if items:
                 return items
-        return []
+        if 'thepioneerwoman.' in url:
+            items = parsePioneerWoman()
+            if items:
+                return items
+        if 'tasteofhome.' in url:
+            items = parseTasteOfHome()
+            if items:
+                return items
+        # Add more site checks here for other popular recipe sites
+
+    # Try all known parsers, return first with results
+    for parser in [parseSite1, parseSite2, parseSite3, parsePioneerWoman, parseTasteOfHome, parseGenericListItems]:
+        items = parser()
+        if items:
+            return items
+    return []
+
+
+def getInfo(html: str, index = None, url: str = None):
+    # MAX_PAGE_BYTES is enforced on the raw bytes when fetching (getHtmlBytes)
+    return _parseIngredients(html, index, url, lambda text: text)
+
+
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+                    "ref", "ref_src", "_ga", "amp", "outputtype", "cmpid", "sc_cid"}
+
+
+def canonicalizeUrl(url: str) -> str:
+    """Normalize a recipe URL so different links to the same page compare equal.
+
+    Forces https, lowercases the host and drops "www.", removes AMP
+    variants, tracking parameters, fragments and trailing slashes, and
+    sorts the remaining query parameters. A URL that cannot be parsed
+    (bad port, unbalanced IPv6 brackets...) is returned stripped but
+    otherwise unchanged, so it still only matches itself.
+    """
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+    url = (url or "").strip()
+    raw = url
+    if "://" not in url:
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return raw
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("amp."):
+        host = host[4:]
+    if ":" in host:
+        # hostname drops the brackets from IPv6 literals; put them back
+        host = f"[{host}]"
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    segments = [seg for seg in parts.path.split("/") if seg and seg.lower() != "amp"]
+    path = "/" + "/".join(segments)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+class _Call:
+    """One in-flight fetch that other callers for the same key can wait on."""
+    def __init__(self):
+        import threading
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_inflight = {}
+# created on first use so importing this module doesn't pull in threading
+_inflightLock = None
+_lazyLocks = {}
+
+
+def _getInflightLock():
+    global _inflightLock
+    if _inflightLock is None:
+        import threading
+        # setdefault is atomic, so racing first callers still end up sharing one lock
+        _inflightLock = _lazyLocks.setdefault("inflight", threading.Lock())
+    return _inflightLock
+
+
+def _waiterError(error: BaseException) -> BaseException:
+    """A fresh exception for one waiting caller, of the same type as the leader's.
+
+    Re-raising the leader's exception object from several threads would pile
+    every thread's frames onto its shared __traceback__.
+    """
+    import copy
+    try:
+        return copy.copy(error)
+    except Exception:
+        return RuntimeError(f"shared fetch failed: {error!r}")
+
+
+def _singleFlight(key, fn):
+    """Run fn() once per key at a time; concurrent callers share its result."""
+    with _getInflightLock():
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise _waiterError(call.error) from call.error
+        return call.result
+    try:
+        call.result = fn()
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _getInflightLock():
+            del _inflight[key]
+        call.done.set()
+
+
+def getIngredients(url: str, index=None) -> list:
+    """Fetch and parse a recipe page, coalescing concurrent requests.
+
+    Requests whose URLs canonicalize to the same page while a fetch is
+    already running wait for that fetch instead of starting their own.
+    Each caller gets its own Ingredient objects stamped with its index/url.
+    """
+    def fetch():
+        data, encoding = getHtmlBytes(url)
+        return getInfoBytes(data, None, url, encoding)
+    items = _singleFlight(canonicalizeUrl(url), fetch)
+    return [Ingredient(it.quantity, it.unit, it.name, index, url) for it in items]
+
+
+def getInfoBytes(data, index=None, url: str = None, encoding: str = "utf-8"):
+    """Byte-level counterpart of getInfo.
+
+    `data` may be bytes, bytearray or a memoryview (e.g. straight from
+    getHtmlBytes). The page is never decoded as a whole; only the matched
+    ingredient fragments are decoded with `encoding`. Encodings that are not
+    ASCII-compatible (UTF-16/32) fall back to decoding the page for getInfo.
+    """
+    if not _isAsciiCompatible(encoding):
+        # UTF-16/32 pages: the byte patterns cannot match, so decode and parse as text
+        return getInfo(bytes(data).decode(encoding, errors="replace"), index, url)
+    if not isinstance(data, memoryview):
+        data = memoryview(data)
+    data = data[:MAX_PAGE_BYTES]
+    return _parseIngredients(data, index, url, lambda raw: raw.decode(encoding, errors="replace"))
@@ -0,0 +1,60 @@
+import random
+
+from parser_1 import Ingredient
+from groceryListGenerator import (
+    PartialAggregate, combineIngredients, combineIngredientsParallel,
+)
+
+
+NAMES = ["chicken breasts", "boneless chicken breast", "butter", "unsalted butter", "garlic",
+         "salt", "parmesan cheese", "freshly grated parmesan cheese", "flour", "eggs"]
+UNITS = ["cup", "lb", "oz", "", "piece", "tbsp", "cloves", "pinch", "lbs"]
+QUANTITIES = ["1", "2", "1/2", "1 1/2", "½", "to taste", "3"]
+
+
+def randomItems(count, seed=1):
+    rng = random.Random(seed)
+    return [Ingredient(rng.choice(QUANTITIES), rng.choice(UNITS), rng.choice(NAMES)) for _ in range(count)]
+
+
+def fields(items):
+    return [(it.quantity, it.unit, it.name) for it in items]
+
+
+def shardsOf(items, size):
+    return [PartialAggregate().addAll(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+def test_combineIngredients():
+    items = [Ingredient("1", "cup", "butter"), Ingredient("1/2", "cup", "unsalted butter"),
+             Ingredient("to taste", "", "salt"), Ingredient("2", "", "eggs")]
+    assert fields(combineIngredients(items)) == [("24", "tbsp", "unsalted butter"), ("2", "", "eggs")]
+
+
+def test_merged_shards_match_combineIngredients():
+    items = randomItems(3000)
+    expected = fields(combineIngredients(items))
+    for size in (1, 7, 500, 3000):
+        result = PartialAggregate()
+        for shard in shardsOf(items, size):
+            result.mergeInto(shard)
+        assert fields(result.toIngredients()) == expected
+        assert result.nonNumericCount == sum(it.quantity == "to taste" for it in items)
+
+
+def test_merge_is_associative_and_copies():
+    a, b, c = shardsOf(randomItems(900, seed=2), 300)
+    before = {key: dict(entry) for key, entry in a.agg.items()}
+    left = a.merge(b).merge(c)
+    right = a.merge(b.merge(c))
+    assert left.agg == right.agg
+    assert left.nonNumericCount == right.nonNumericCount
+    assert list(left.agg) == list(right.agg)
+    assert a.agg == before
+
+
+def test_combineIngredientsParallel_matches_combineIngredients():
+    items = randomItems(5000, seed=3)
+    assert fields(combineIngredientsParallel(items, workers=2, shardSize=700)) == fields(combineIngredients(items))
+    # small inputs are combined inline
+    assert fields(combineIngredientsParallel(items[:10])) == fields(combineIngredients(items[:10]))
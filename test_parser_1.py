@@ -0,0 +1,358 @@
+import codecs
+import gzip
+import threading
+import time
+import traceback
+import zlib
+
+import pytest
+
+import parser_1
+from parser_1 import (
+    _decompress, _singleFlight, canonicalizeUrl, detectCharset, getIngredients,
+    getInfo, getInfoBytes,
+)
+
+
+def fields(items):
+    return [(it.quantity, it.unit, it.name) for it in items]
+
+
+# --- fetching / charset ---
+
+def test_detectCharset_order():
+    assert detectCharset("text/html; charset=ISO-8859-1", b"") == "iso8859-1"
+    assert detectCharset("", b'<meta charset="windows-1252">') == "cp1252"
+    assert detectCharset("text/html; charset=bogus", b"") == "utf-8"
+    assert detectCharset("", b"") == "utf-8"
+
+
+def test_detectCharset_bom_wins_over_header_and_meta():
+    body = codecs.BOM_UTF8 + b'<meta charset="latin-1">'
+    assert detectCharset("text/html; charset=ISO-8859-1", body) == "utf-8-sig"
+    body = "<li>1 cup sugar</li>".encode("utf-16")
+    assert detectCharset("text/html; charset=utf-8", body) == "utf-16"
+    body = "<li>1 cup sugar</li>".encode("utf-32")
+    assert detectCharset("", body) == "utf-32"
+
+
+def test_decompress():
+    data = b"<li>1 cup sugar</li>" * 50
+    assert _decompress(data, "") == data
+    assert _decompress(gzip.compress(data), "gzip") == data
+    assert _decompress(zlib.compress(data), "deflate") == data
+    # raw deflate without the zlib header
+    assert _decompress(zlib.compress(data)[2:-4], "deflate") == data
+
+
+def test_getInfoBytes_non_ascii_compatible_encoding():
+    html = '<ul><li>1 cup jalapeño</li><li>2 limes</li></ul>'
+    for encoding in ("utf-16", "utf-32"):
+        data = html.encode(encoding)
+        assert fields(getInfoBytes(data, 0, None, detectCharset("", data))) == fields(getInfo(html))
+        assert fields(getInfoBytes(data, 0, None, detectCharset("", data))) == [("1", "cup", "jalapeño"), ("2", "", "limes")]
+
+
+def test_getInfoBytes_latin1():
+    html = '<li>1 cup jalapeño</li>'
+    assert fields(getInfoBytes(html.encode("latin-1"), 0, None, "iso8859-1")) == [("1", "cup", "jalapeño")]
+
+
+# --- URL canonicalization / request coalescing ---
+
+@pytest.mark.parametrize("url", [
+    "https://allrecipes.com/recipe/123/foo",
+    "http://allrecipes.com/recipe/123/foo",
+    "https://www.allrecipes.com/recipe/123/foo/",
+    "https://WWW.AllRecipes.com/recipe/123/foo#reviews",
+    "https://amp.allrecipes.com/recipe/123/foo",
+    "https://allrecipes.com/amp/recipe/123/foo",
+    "https://allrecipes.com/recipe/123/foo/amp/",
+    "https://allrecipes.com/recipe/123/foo?utm_source=pin&utm_medium=social&fbclid=abc",
+    "allrecipes.com/recipe/123/foo",
+    "https://allrecipes.com:443/recipe/123/foo",
+    "http://allrecipes.com:80/recipe/123/foo",
+])
+def test_canonicalizeUrl_variants(url):
+    assert canonicalizeUrl(url) == "https://allrecipes.com/recipe/123/foo"
+
+
+def test_canonicalizeUrl_keeps_meaningful_parts():
+    assert canonicalizeUrl("https://a.com/r?b=2&a=1&utm_x=3") == "https://a.com/r?a=1&b=2"
+    assert canonicalizeUrl("https://a.com:8080/r/") == "https://a.com:8080/r"
+    assert canonicalizeUrl("https://a.com/Recipe/X") == "https://a.com/Recipe/X"
+    assert canonicalizeUrl("https://a.com/") == "https://a.com/"
+    # IPv6 literals keep their brackets, so host and port can't run together
+    assert canonicalizeUrl("https://[::1]:8080/x") == "https://[::1]:8080/x"
+    assert canonicalizeUrl("https://[::1:8080]/x") == "https://[::1:8080]/x"
+    assert canonicalizeUrl("http://[::1]/x") == "https://[::1]/x"
+
+
+@pytest.mark.parametrize("url", ["https://example.com:abc/x", "http://[::1/x", "  http://[::1/x "])
+def test_canonicalizeUrl_malformed_falls_back_to_raw(url):
+    assert canonicalizeUrl(url) == url.strip()
+
+
+def _startCallers(fn, urls, monkeypatch):
+    """Run getIngredients(url, i) for each url in its own thread while fn is the fetcher.
+
+    The first fetch is held open until every other caller has started, so
+    the callers overlap.
+    """
+    started = threading.Event()
+    release = threading.Event()
+    fetches = []
+
+    def fakeFetch(url):
+        fetches.append(url)
+        started.set()
+        release.wait(5)
+        return fn(url)
+
+    monkeypatch.setattr(parser_1, "getHtmlBytes", fakeFetch)
+    results = {}
+
+    def run(i, url):
+        try:
+            results[i] = getIngredients(url, i)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i, url)) for i, url in enumerate(urls)]
+    threads[0].start()
+    assert started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join(5)
+    return fetches, results
+
+
+def test_getIngredients_concurrent_callers_share_one_fetch(monkeypatch):
+    page = (b'<li class="ingredients-item">1 cup sugar</li>', "utf-8")
+    urls = ["https://www.allrecipes.com/r/1", "http://allrecipes.com/r/1/?utm_source=x"]
+    fetches, results = _startCallers(lambda url: page, urls, monkeypatch)
+    assert fetches == [urls[0]]
+    for i, url in enumerate(urls):
+        assert [(it.quantity, it.unit, it.name, it.index, it.url) for it in results[i]] == [("1", "cup", "sugar", i, url)]
+    assert results[0][0] is not results[1][0]
+    assert parser_1._inflight == {}
+
+
+def test_getIngredients_error_reaches_waiting_callers(monkeypatch):
+    def failingFetch(url):
+        raise OSError("connection reset")
+    urls = ["https://a.com/r", "https://www.a.com/r/", "http://a.com/r"]
+    fetches, results = _startCallers(failingFetch, urls, monkeypatch)
+    assert len(fetches) == 1
+    assert all(isinstance(results[i], OSError) for i in range(len(urls)))
+    # every caller gets its own exception, whose traceback holds only its own frames
+    assert len({id(e) for e in results.values()}) == len(urls)
+    for i, error in results.items():
+        frames = [frame.name for frame in traceback.extract_tb(error.__traceback__)]
+        assert frames.count("run") == 1
+        if i == 0:
+            assert "failingFetch" in frames
+        else:
+            assert "failingFetch" not in frames
+            assert error.__cause__ is results[0]
+    assert parser_1._inflight == {}
+
+
+def test_singleFlight_runs_again_after_completion():
+    calls = []
+    assert _singleFlight("k", lambda: calls.append(1) or "a") == "a"
+    assert _singleFlight("k", lambda: calls.append(1) or "b") == "b"
+    assert len(calls) == 2
+
+
+# --- page scanning ---
+
+SITE_PAGES = {
+    "https://www.allrecipes.com/recipe/1": (
+        '<ul><li class="mntl ingredients-item x"><span>1</span> cup <b>sugar</b></li>'
+        '<li class="ingredients-item">2 eggs</li><li class="nav">Home</li></ul>',
+        [("1", "cup", "sugar"), ("2", "", "eggs")]),
+    "https://tastesbetterfromscratch.com/r": (
+        '<li class="wprm-recipe-ingredient"><span class="wprm-recipe-ingredient-amount">½</span>'
+        '<span class="wprm-recipe-ingredient-unit">cup</span>'
+        '<span class="wprm-recipe-ingredient-name"><a href="#">crème fraîche</a></span></li>'
+        '<li class="wprm-recipe-ingredient"><span class="wprm-recipe-ingredient-name">salt</span></li>',
+        [("½", "cup", "crème fraîche"), ("", "", "salt")]),
+    "https://example.com/data-attrs": (
+        '<span data-ingredient-quantity="true">1</span><span data-ingredient-unit="true">tsp</span>'
+        '<span data-ingredient-name="true">salt</span><span data-ingredient-quantity="true">2</span>'
+        '<span data-ingredient-unit="true">cups</span><span data-ingredient-name="true">flour</span>',
+        [("1", "tsp", "salt"), ("2", "cups", "flour")]),
+    "https://www.thepioneerwoman.com/r": (
+        '<li class="ingredient-item"><span>1</span> <span>cup</span> broccoli florets</li>',
+        [("1", "cup", "broccoli florets")]),
+    "https://www.tasteofhome.com/r": (
+        '<li class="recipe-ingredients__item">1 can cream of chicken soup</li>',
+        [("1", "can", "cream of chicken soup")]),
+    "https://example.com/generic": (
+        '<li>nav</li><li>½ cup jalapeño</li><li class="a">3 limes</li><link rel="x"><li>unclosed',
+        [("½", "cup", "jalapeño"), ("3", "", "limes")]),
+    "https://www.allrecipes.com/stray-lt": (
+        '<li class="ingredients-item">1 cup a < b sugar</li><li class="ingredients-item">2 tbsp butter</li>',
+        [("1", "cup", "a < b sugar"), ("2", "tbsp", "butter")]),
+}
+
+
+def _regexListItems(html, classFragment="", requireNumber=False):
+    """The regex-based <li> parser that _scanElements replaced, kept as a reference."""
+    import re
+    if classFragment:
+        pattern = re.compile(r'<li[^>]*class="[^"]*' + re.escape(classFragment) + r'[^"]*"[^>]*>(.*?)</li>', re.DOTALL)
+    else:
+        pattern = re.compile(r'<li[^>]*>(.*?)</li>', re.DOTALL)
+    items = []
+    for match in pattern.finditer(html):
+        text = re.sub(r'<[^>]+>', '', match.group(1)).strip()
+        if requireNumber and not re.match(r'^[\d\u00BC-\u00BE\u2150-\u215E]', text):
+            continue
+        parts = text.split()
+        if len(parts) >= 3:
+            items.append((parts[0], parts[1], ' '.join(parts[2:])))
+        elif len(parts) == 2:
+            items.append((parts[0], '', parts[1]))
+        elif len(parts) == 1:
+            items.append(('', '', parts[0]))
+    return items
+
+
+@pytest.mark.parametrize("url", list(SITE_PAGES))
+def test_site_parsers(url):
+    html, expected = SITE_PAGES[url]
+    assert fields(getInfo(html, 0, url)) == expected
+    assert fields(getInfoBytes(html.encode("utf-8"), 0, url)) == expected
+    # with no URL the fallback chain must find the same items
+    assert fields(getInfo(html)) == expected
+    assert all(it.index == 0 and it.url == url for it in getInfo(html, 0, url))
+
+
+@pytest.mark.parametrize("classFragment, url", [
+    ("ingredients-item", "https://www.allrecipes.com/x"),
+    ("ingredient-item", "https://www.thepioneerwoman.com/x"),
+    ("recipe-ingredients__item", "https://www.tasteofhome.com/x"),
+    ("", "https://example.com/x"),
+])
+def test_list_parsers_match_regex_reference(classFragment, url):
+    cls = f' class="a {classFragment} b"' if classFragment else ""
+    html = (f'<ul><li{cls}>1 cup <b>flour</b></li>\n<li{cls}>\n  2 <i>large</i> eggs, beaten\n</li>'
+            f'<li{cls}>½ tsp salt <>x</li><li{cls}>3 limes<li{cls}>4 figs</li>'
+            f'<li{cls}><span>5</span></li><li{cls}>6 tbsp a<<b>c</li></ul>')
+    expected = _regexListItems(html, classFragment, requireNumber=not classFragment)
+    assert expected
+    assert fields(getInfo(html, 0, url)) == expected
+    assert fields(getInfoBytes(html.encode("utf-8"), 0, url)) == expected
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+@pytest.mark.parametrize("html", [
+    '<li class="ingredients-item">1 cup x ' * 20000,
+    '<li>1 cup x ' * 20000,
+    '<li ' * 20000,
+    '<li class="ingredients-item' * 20000,
+    '<li class="ingredients-item">' + '<' * 50000 + '</li>',
+], ids=["unclosed-li-class", "unclosed-li", "unterminated-li", "unterminated-class", "lt-soup"])
+def test_pathological_pages_are_fast(html):
+    for url in (None, "https://www.allrecipes.com/x"):
+        _, elapsed = _timed(lambda: getInfo(html, 0, url))
+        assert elapsed < 0.25
+        _, elapsed = _timed(lambda: getInfoBytes(html.encode("utf-8"), 0, url))
+        assert elapsed < 0.25
+
+
+def test_large_normal_page():
+    html = ('<html><body>' + '<div class="c">x</div>\n' * 60000 + '<ul>'
+            + ''.join(f'<li class="ingredients-item">{i} cup thing{i}</li>' for i in range(1, 11))
+            + '</ul></body></html>')
+    expected = [(str(i), "cup", f"thing{i}") for i in range(1, 11)]
+    for url in (None, "https://www.allrecipes.com/x"):
+        items, elapsed = _timed(lambda: getInfo(html, 0, url))
+        assert fields(items) == expected and elapsed < 0.25
+        items, elapsed = _timed(lambda: getInfoBytes(html.encode("utf-8"), 0, url))
+        assert fields(items) == expected and elapsed < 0.25
+
+
+def test_budget_exhaustion_raises(monkeypatch):
+    monkeypatch.setattr(parser_1, "PAGE_TIME_BUDGET", 0.0)
+    html = '<li>1 cup x</li>' * 1000
+    with pytest.raises(parser_1.ScanBudgetExceeded):
+        getInfo(html)
+    with pytest.raises(parser_1.ScanBudgetExceeded):
+        getInfoBytes(html.encode("utf-8"))
+
+
+def test_budget_error_is_not_an_io_error():
+    assert not issubclass(parser_1.ScanBudgetExceeded, OSError)
+
+
+def test_budget_stays_exhausted():
+    budget = parser_1._ScanBudget(0.0)
+    time.sleep(0.001)
+    assert budget.exhausted()
+    assert all(budget.exhausted() for _ in range(1000))
+
+
+# --- size limits at fetch time ---
+
+def test_decompress_is_bounded():
+    bomb = gzip.compress(b"\0" * (50 * 1024 * 1024))
+    assert len(_decompress(bomb, "gzip", 1024)) == 1024
+    assert len(_decompress(zlib.compress(b"\0" * (50 * 1024 * 1024)), "deflate", 1024)) == 1024
+    assert len(_decompress(bomb, "gzip")) == parser_1.MAX_PAGE_BYTES
+    # truncated input decodes to the available prefix instead of raising
+    import random
+    data = random.Random(0).randbytes(20000)
+    prefix = _decompress(gzip.compress(data)[:10000], "gzip")
+    assert 0 < len(prefix) < len(data) and data.startswith(prefix)
+
+
+def _serve(body, headers):
+    import http.server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+def test_getHtmlBytes_urllib_caps_gzip_bomb(monkeypatch):
+    monkeypatch.setattr(parser_1, "_requests", False)
+    monkeypatch.setattr(parser_1, "MAX_PAGE_BYTES", 4096)
+    server, url = _serve(gzip.compress(b"<li>1 cup x</li>" * 1000000),
+                         {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"})
+    try:
+        data, encoding = parser_1.getHtmlBytes(url)
+    finally:
+        server.shutdown()
+    assert len(data) == 4096 and encoding == "utf-8"
+
+
+def test_getHtml_urllib_decodes_charset(monkeypatch):
+    monkeypatch.setattr(parser_1, "_requests", False)
+    server, url = _serve(gzip.compress("<li>1 cup jalapeño</li>".encode("latin-1")),
+                         {"Content-Type": "text/html; charset=ISO-8859-1", "Content-Encoding": "gzip"})
+    try:
+        assert parser_1.getHtml(url) == "<li>1 cup jalapeño</li>"
+    finally:
+        server.shutdown()